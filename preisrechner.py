@@ -9,15 +9,20 @@ Starten:
 from __future__ import annotations
 from dataclasses import dataclass, asdict
 import json
-import time
 import math
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+try:
+    from numba import njit
+except ImportError:  # Numba ist optional – ohne läuft compute_cost_vec rein über NumPy
+    njit = None
+
 # =====================
 # Kern-Modelle & Logik
 # =====================
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PricingInputs:
     filament_used_g: float
     print_time_h: float
@@ -42,51 +47,148 @@ class PricingInputs:
     purge_waste_g: float = 0.0   # z.B. AMS Farbwechsel-Abfall
 
 
-def round_money(x: float) -> float:
-    return round(x + 1e-9, 2)
-
-
-def compute_cost(inputs: PricingInputs):
-    grams_total = inputs.filament_used_g + inputs.purge_waste_g
-
-    material_eur = (grams_total / 1000.0) * inputs.filament_eur_per_kg
-    kwh = (inputs.avg_power_w * inputs.print_time_h) / 1000.0
-    energy_eur = kwh * inputs.electricity_eur_per_kwh
-    machine_eur = inputs.print_time_h * inputs.depreciation_eur_per_h
-    labor_eur = inputs.labor_hours * inputs.labor_rate_eur_per_h
+_BREAKDOWN_KEYS = (
+    "Material", "Energie", "Maschine/Verschleiß", "Arbeit",
+    "Verbrauchsmaterial-Puffer", "Risiko-Puffer", "Zwischensumme",
+    "Marge/Aufschlag", "Summe vor Rabatt", "Freundschaftsrabatt",
+    "Verpackung/Versand", "Empfohlener Preis",
+)
 
-    consumables_eur = (material_eur + energy_eur) * inputs.consumables_ratio
-    risk_buffer_eur = (material_eur + energy_eur + machine_eur) * inputs.risk_ratio
+_VEC_COLS = _BREAKDOWN_KEYS + ("kwh", "filament_total_g")
+
+# Tabellenzeilen: alle Positionen außer dem Endpreis (der steht in der Kopfkarte)
+_TABLE_KEYS = _BREAKDOWN_KEYS[:-1]
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _compute_cost_kernel(grams, purge, hours, fil_kg, kwh_p, power_w, depr,
+                             cons, lab_h, lab_r, risk, mk, fr, pack, minfee, out):
+        for i in range(grams.shape[0]):
+            grams_total = grams[i] + purge[i]
+            material = (grams_total / 1000.0) * fil_kg[i]
+            kwh = power_w[i] * hours[i] / 1000.0
+            energy = kwh * kwh_p[i]
+            machine = hours[i] * depr[i]
+            labor = lab_h[i] * lab_r[i]
+            cons_eur = (material + energy) * cons[i]
+            risk_eur = (material + energy + machine) * risk[i]
+            subtotal = material + energy + machine + labor + cons_eur + risk_eur
+            markup_eur = subtotal * mk[i]
+            pre_discount = subtotal + markup_eur
+            friend_eur = pre_discount * fr[i]
+            total = pre_discount - friend_eur + pack[i]
+            out[i, 0] = material
+            out[i, 1] = energy
+            out[i, 2] = machine
+            out[i, 3] = labor
+            out[i, 4] = cons_eur
+            out[i, 5] = risk_eur
+            out[i, 6] = subtotal
+            out[i, 7] = markup_eur
+            out[i, 8] = pre_discount
+            out[i, 9] = friend_eur
+            out[i, 10] = pack[i]
+            out[i, 11] = max(total, minfee[i])
+            out[i, 12] = kwh
+            out[i, 13] = grams_total
+
+
+def compute_cost_vec(grams, purge, hours, filament_eur_per_kg, kwh_price, power_w,
+                     depr, consumables, labor_h, labor_rate, risk, markup, friend,
+                     pack_ship, min_fee):
+    """Vektorisierte Kostenrechnung für Parameter-Sweeps (z.B. Preis vs. Gramm).
+
+    Alle Argumente dürfen Skalare oder NumPy-Arrays sein und werden per
+    Broadcasting kombiniert. Liefert ein dict mit ungerundeten Arrays für
+    jede Breakdown-Position plus "kwh" und "filament_total_g".
+
+    Ist Numba installiert, laufen 1-D-Sweeps über einen @njit-Kernel, der
+    alle Positionen in einem einzigen Durchlauf berechnet.
+    """
+    if njit is not None:
+        args = [np.asarray(a, dtype=float) for a in (
+            grams, purge, hours, filament_eur_per_kg, kwh_price, power_w, depr,
+            consumables, labor_h, labor_rate, risk, markup, friend, pack_ship, min_fee)]
+        shape = np.broadcast_shapes(*(a.shape for a in args))
+        if len(shape) == 1:
+            flat = [np.ascontiguousarray(np.broadcast_to(a, shape)) for a in args]
+            out = np.empty((shape[0], len(_VEC_COLS)))
+            _compute_cost_kernel(*flat, out)
+            return dict(zip(_VEC_COLS, out.T))
+
+    grams_total = np.asarray(grams, dtype=float) + purge
+
+    material_eur = (grams_total / 1000.0) * filament_eur_per_kg
+    kwh = np.asarray(power_w, dtype=float) * hours / 1000.0
+    energy_eur = kwh * kwh_price
+    machine_eur = np.asarray(hours, dtype=float) * depr
+    labor_eur = np.asarray(labor_h, dtype=float) * labor_rate
+
+    consumables_eur = (material_eur + energy_eur) * consumables
+    risk_buffer_eur = (material_eur + energy_eur + machine_eur) * risk
 
     subtotal_before_markup = material_eur + energy_eur + machine_eur + labor_eur + consumables_eur + risk_buffer_eur
-    markup_eur = subtotal_before_markup * inputs.markup_ratio
+    markup_eur = subtotal_before_markup * markup
     pre_discount_total = subtotal_before_markup + markup_eur
-    friend_discount_eur = pre_discount_total * inputs.friend_discount_ratio
-    total = pre_discount_total - friend_discount_eur + inputs.packaging_shipping_eur
-    final_total_eur = max(total, inputs.min_fee_eur)
-
-    breakdown = {
-        "Material": round_money(material_eur),
-        "Energie": round_money(energy_eur),
-        "Maschine/Verschleiß": round_money(machine_eur),
-        "Arbeit": round_money(labor_eur),
-        "Verbrauchsmaterial-Puffer": round_money(consumables_eur),
-        "Risiko-Puffer": round_money(risk_buffer_eur),
-        "Zwischensumme": round_money(subtotal_before_markup),
-        "Marge/Aufschlag": round_money(markup_eur),
-        "Summe vor Rabatt": round_money(pre_discount_total),
-        "Freundschaftsrabatt": round_money(friend_discount_eur),
-        "Verpackung/Versand": round_money(inputs.packaging_shipping_eur),
-        "Empfohlener Preis": round_money(final_total_eur),
+    friend_discount_eur = pre_discount_total * friend
+    total = pre_discount_total - friend_discount_eur + pack_ship
+    final_total_eur = np.maximum(total, min_fee)
+
+    return {
+        "Material": material_eur,
+        "Energie": energy_eur,
+        "Maschine/Verschleiß": machine_eur,
+        "Arbeit": labor_eur,
+        "Verbrauchsmaterial-Puffer": consumables_eur,
+        "Risiko-Puffer": risk_buffer_eur,
+        "Zwischensumme": subtotal_before_markup,
+        "Marge/Aufschlag": markup_eur,
+        "Summe vor Rabatt": pre_discount_total,
+        "Freundschaftsrabatt": friend_discount_eur,
+        "Verpackung/Versand": np.broadcast_to(np.asarray(pack_ship, dtype=float), final_total_eur.shape),
+        "Empfohlener Preis": final_total_eur,
+        "kwh": kwh,
+        "filament_total_g": grams_total,
     }
 
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def compute_cost(inputs: PricingInputs):
+    cols = compute_cost_vec(
+        inputs.filament_used_g, inputs.purge_waste_g, inputs.print_time_h,
+        inputs.filament_eur_per_kg, inputs.electricity_eur_per_kwh, inputs.avg_power_w,
+        inputs.depreciation_eur_per_h, inputs.consumables_ratio,
+        inputs.labor_hours, inputs.labor_rate_eur_per_h,
+        inputs.risk_ratio, inputs.markup_ratio, inputs.friend_discount_ratio,
+        inputs.packaging_shipping_eur, inputs.min_fee_eur,
+    )
+
+    vals = np.array([float(cols[k]) for k in _BREAKDOWN_KEYS])
+    vals = np.round(vals + 1e-9, 2)
+    breakdown = dict(zip(_BREAKDOWN_KEYS, vals.tolist()))
+
     meta = {
-        "kwh": round(kwh, 3),
-        "filament_total_g": round(grams_total, 1)
+        "kwh": round(float(cols["kwh"]), 3),
+        "filament_total_g": round(float(cols["filament_total_g"]), 1)
     }
     return breakdown, meta
 
 
+@st.cache_data(show_spinner=False)
+def build_table(breakdown_items: tuple):
+    b = dict(breakdown_items)
+    rows = [(k, -abs(b[k]) if k == "Freundschaftsrabatt" else b[k]) for k in _TABLE_KEYS]
+    df = pd.DataFrame(rows, columns=["Posten", "€"])
+    return df, df.to_csv(index=False).encode("utf-8")
+
+
+@st.cache_data(show_spinner=False)
+def export_json(inputs_items: tuple, breakdown_items: tuple, meta_items: tuple) -> bytes:
+    d = {**dict(inputs_items), "breakdown": dict(breakdown_items), **dict(meta_items)}
+    return json.dumps(d, ensure_ascii=False, indent=2).encode("utf-8")
+
+
 # =====================
 # UI-Helfer
 # =====================
@@ -117,19 +219,30 @@ CUSTOM_CSS = f"""
 """
 
 
+@st.cache_resource(show_spinner=False)
+def _inject_css() -> bool:
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+    return True
+
+
+@st.cache_data(show_spinner=False)
+def _card_html(title: str, value: str, subtitle: str = "") -> str:
+    return ("<div class='metric-card'>" +
+            f"<div class='sub'>{title}</div>" +
+            f"<div class='price'>{value}</div>" +
+            (f"<div class='footer-note'>{subtitle}</div>" if subtitle else "") +
+            "</div>")
+
+
 def metric_card(title: str, value: str, subtitle: str = ""):
-    st.markdown("<div class='metric-card'>" +
-                f"<div class='sub'>{title}</div>" +
-                f"<div class='price'>{value}</div>" +
-                (f"<div class='footer-note'>{subtitle}</div>" if subtitle else "") +
-                "</div>", unsafe_allow_html=True)
+    st.markdown(_card_html(title, value, subtitle), unsafe_allow_html=True)
 
 
 # =====================
 # App
 # =====================
 st.set_page_config(page_title="3D‑Druck Preisrechner", page_icon="🖨️", layout="wide")
-st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+_inject_css()
 
 st.markdown("""
 # 🖨️ 3D‑Druck Preisrechner
@@ -142,28 +255,33 @@ with st.sidebar:
     st.header("Eingaben")
     st.caption("Nutze Slider für schnelle Schätzungen – Feintuning per Zahleneingabe.")
 
-    grams = st.slider("Filamentverbrauch (g)", 0, 2000, 100, 10)
-    purge = st.slider("Purge/Abfall (g)", 0, 500, 0, 5, help="z. B. AMS‑Farbwechsel")
-    hours = st.slider("Druckzeit (h)", 0.0, 48.0, 6.0, 0.5)
-
-    st.divider()
-    st.subheader("Material & Energie")
-    filament_eur_kg = st.number_input("Filament €/kg", 0.0, 150.0, 22.0, 0.5)
-    kwh_price = st.number_input("Strompreis €/kWh", 0.0, 2.0, 0.25, 0.01)
-    power_w = st.slider("Ø Leistung (W)", 0, 500, 80, 5)
-
-    st.subheader("Maschine & Arbeit")
-    depr = st.slider("Verschleiß/Abschreibung €/h", 0.0, 5.0, 0.5, 0.1)
-    consumables = st.slider("Verbrauchsmaterial‑Anteil", 0.0, 0.5, 0.05, 0.01)
-    labor_h = st.slider("Arbeitszeit (h)", 0.0, 24.0, 1.0, 0.5)
-    labor_rate = st.slider("Stundensatz €/h", 0.0, 200.0, 30.0, 5.0)
-
-    st.subheader("Puffer, Rabatt & Co.")
-    risk = st.slider("Risiko‑Anteil", 0.0, 0.5, 0.10, 0.01)
-    markup = st.slider("Marge/Aufschlag", 0.0, 0.5, 0.0, 0.01)
-    friend = st.slider("Freundschaftsrabatt", 0.0, 0.9, 0.20, 0.01)
-    pack_ship = st.number_input("Verpackung/Versand (€)", 0.0, 500.0, 0.0, 0.5)
-    min_fee = st.number_input("Mindestbetrag (€)", 0.0, 100.0, 10.0, 1.0)
+    # st.form bündelt alle Eingaben: erst "Berechnen" löst den Rerun aus,
+    # nicht jeder einzelne Slider-Tick.
+    with st.form("inputs", border=False):
+        grams = st.slider("Filamentverbrauch (g)", 0, 2000, 100, 10, key="grams")
+        purge = st.slider("Purge/Abfall (g)", 0, 500, 0, 5, help="z. B. AMS‑Farbwechsel", key="purge")
+        hours = st.slider("Druckzeit (h)", 0.0, 48.0, 6.0, 0.5, key="hours")
+
+        st.divider()
+        st.subheader("Material & Energie")
+        filament_eur_kg = st.number_input("Filament €/kg", 0.0, 150.0, 22.0, 0.5, key="filament_eur_kg")
+        kwh_price = st.number_input("Strompreis €/kWh", 0.0, 2.0, 0.25, 0.01, key="kwh_price")
+        power_w = st.slider("Ø Leistung (W)", 0, 500, 80, 5, key="power_w")
+
+        st.subheader("Maschine & Arbeit")
+        depr = st.slider("Verschleiß/Abschreibung €/h", 0.0, 5.0, 0.5, 0.1, key="depr")
+        consumables = st.slider("Verbrauchsmaterial‑Anteil", 0.0, 0.5, 0.05, 0.01, key="consumables")
+        labor_h = st.slider("Arbeitszeit (h)", 0.0, 24.0, 1.0, 0.5, key="labor_h")
+        labor_rate = st.slider("Stundensatz €/h", 0.0, 200.0, 30.0, 5.0, key="labor_rate")
+
+        st.subheader("Puffer, Rabatt & Co.")
+        risk = st.slider("Risiko‑Anteil", 0.0, 0.5, 0.10, 0.01, key="risk")
+        markup = st.slider("Marge/Aufschlag", 0.0, 0.5, 0.0, 0.01, key="markup")
+        friend = st.slider("Freundschaftsrabatt", 0.0, 0.9, 0.20, 0.01, key="friend")
+        pack_ship = st.number_input("Verpackung/Versand (€)", 0.0, 500.0, 0.0, 0.5, key="pack_ship")
+        min_fee = st.number_input("Mindestbetrag (€)", 0.0, 100.0, 10.0, 1.0, key="min_fee")
+
+        submitted = st.form_submit_button("🧮 Berechnen")
 
     st.divider()
     if st.button("🎈 Kleines Easter‑Egg"):
@@ -187,10 +305,6 @@ inputs = PricingInputs(
     min_fee_eur=min_fee,
 )
 
-# Simulierter Mini‑Progress für "Feedback"
-with st.spinner("Berechne Preis …"):
-    time.sleep(0.2)
-
 breakdown, meta = compute_cost(inputs)
 
 # ======= Kopfzeile mit Kernmetriken ========
@@ -207,19 +321,7 @@ with colD:
 st.write("")
 
 # ======= Detailtabelle ========
-df = pd.DataFrame([
-    ("Material", breakdown["Material"]),
-    ("Energie", breakdown["Energie"]),
-    ("Maschine/Verschleiß", breakdown["Maschine/Verschleiß"]),
-    ("Arbeit", breakdown["Arbeit"]),
-    ("Verbrauchsmaterial-Puffer", breakdown["Verbrauchsmaterial-Puffer"]),
-    ("Risiko-Puffer", breakdown["Risiko-Puffer"]),
-    ("Zwischensumme", breakdown["Zwischensumme"]),
-    ("Marge/Aufschlag", breakdown["Marge/Aufschlag"]),
-    ("Summe vor Rabatt", breakdown["Summe vor Rabatt"]),
-    ("Freundschaftsrabatt", -abs(breakdown["Freundschaftsrabatt"])) ,
-    ("Verpackung/Versand", breakdown["Verpackung/Versand"]),
-], columns=["Posten", "€"])
+df, csv = build_table(tuple(breakdown.items()))
 
 st.markdown("### Kostenaufschlüsselung")
 st.dataframe(df, hide_index=True, use_container_width=True)
@@ -229,35 +331,35 @@ col1, col2, col3 = st.columns([1,1,1])
 with col1:
     st.download_button(
         "📄 Export als JSON",
-        data=json.dumps({**asdict(inputs), **{"breakdown": breakdown, **meta}}, ensure_ascii=False, indent=2),
+        data=export_json(tuple(asdict(inputs).items()), tuple(breakdown.items()), tuple(meta.items())),
         file_name="druck_preis_kalkulation.json",
         mime="application/json",
     )
 with col2:
-    csv = df.to_csv(index=False).encode("utf-8")
     st.download_button("📊 Export Tabelle (CSV)", data=csv, file_name="kostenaufstellung.csv", mime="text/csv")
 with col3:
     note = f"Empfohlener Preis: € {breakdown['Empfohlener Preis']:.2f} — Filament {meta['filament_total_g']} g, Zeit {inputs.print_time_h:.1f} h"
     st.text_area("Notiz/Angebot (kopieren)", value=note, height=80)
 
 # ======= Presets / Profile ========
+def _apply_preset(values: dict, name: str):
+    # Läuft als on_click-Callback vor der Widget-Instanziierung des nächsten
+    # Reruns – nur so lassen sich die Form-Werte per session_state setzen.
+    st.session_state.update(values)
+    st.toast(f"Preset {name} gesetzt", icon="✅")
+
+
 with st.expander("⚙️ Presets & Schnellwahl"):
     c1, c2, c3 = st.columns(3)
-    if c1.button("PLA – Standard (Bambu)"):
-        st.session_state.update({
-            "Filament €/kg":22.0, "Strompreis €/kWh":0.25, "Ø Leistung (W)":80,
-            "Verschleiß/Abschreibung €/h":0.5, "Verbrauchsmaterial‑Anteil":0.05,
-        })
-        st.toast("Preset PLA gesetzt", icon="✅")
-    if c2.button("PETG – robust"):
-        st.session_state.update({
-            "Filament €/kg":26.0, "Ø Leistung (W)":90, "Risiko‑Anteil":0.12,
-        })
-        st.toast("Preset PETG gesetzt", icon="✅")
-    if c3.button("ABS/ASA – technisch"):
-        st.session_state.update({
-            "Filament €/kg":28.0, "Ø Leistung (W)":110, "Risiko‑Anteil":0.18,
-        })
-        st.toast("Preset ABS/ASA gesetzt", icon="✅")
+    c1.button("PLA – Standard (Bambu)", on_click=_apply_preset, args=({
+        "filament_eur_kg": 22.0, "kwh_price": 0.25, "power_w": 80,
+        "depr": 0.5, "consumables": 0.05,
+    }, "PLA"))
+    c2.button("PETG – robust", on_click=_apply_preset, args=({
+        "filament_eur_kg": 26.0, "power_w": 90, "risk": 0.12,
+    }, "PETG"))
+    c3.button("ABS/ASA – technisch", on_click=_apply_preset, args=({
+        "filament_eur_kg": 28.0, "power_w": 110, "risk": 0.18,
+    }, "ABS/ASA"))
 
 st.markdown("<div class='footer-note'>Tipp: Teile die JSON mit Freund:innen – sie können deine Kalkulation 1:1 nachverfolgen.</div>", unsafe_allow_html=True)